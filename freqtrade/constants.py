@@ -340,6 +340,7 @@ CONF_SCHEMA = {
                     }
                 },
                 'reload': {'type': 'boolean'},
+                'batch_notifications': {'type': 'boolean', 'default': False},
             },
             'required': ['enabled', 'token', 'chat_id'],
         },
@@ -351,6 +352,7 @@ CONF_SCHEMA = {
                 'format': {'type': 'string', 'enum': WEBHOOK_FORMAT_OPTIONS, 'default': 'form'},
                 'retries': {'type': 'integer', 'minimum': 0},
                 'retry_delay': {'type': 'number', 'minimum': 0},
+                'timeout': {'type': 'number', 'minimum': 0, 'exclusiveMinimum': True},
                 **dict([(x, {'type': 'object'}) for x in RPCMessageType]),
                 # Below -> Deprecated
                 'webhookentry': {'type': 'object'},
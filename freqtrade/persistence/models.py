@@ -6,7 +6,7 @@ import threading
 from contextvars import ContextVar
 from typing import Any, Dict, Final, Optional
 
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.exc import NoSuchModuleError
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -41,6 +41,18 @@ def get_request_or_thread_id() -> Optional[str]:
 _SQL_DOCS_URL = 'http://docs.sqlalchemy.org/en/latest/core/engines.html#database-urls'
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune every new connection to a file based sqlite database.
+    journal_mode=wal is persisted in the database file (see set_sqlite_to_wal),
+    synchronous=NORMAL is safe in wal mode and avoids a fsync on every commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 def init_db(db_url: str) -> None:
     """
     Initializes this module with the given config,
@@ -70,6 +82,9 @@ def init_db(db_url: str) -> None:
         raise OperationalException(f"Given value for db_url: '{db_url}' "
                                    f"is no valid database URL! (See {_SQL_DOCS_URL})")
 
+    if engine.name == 'sqlite' and db_url != 'sqlite://':
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+
     # https://docs.sqlalchemy.org/en/13/orm/contextual.html#thread-local-scope
     # Scoped sessions proxy requests to the appropriate thread-local session.
     # Since we also use fastAPI, we need to make it aware of the request id, too
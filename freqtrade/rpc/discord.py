@@ -20,13 +20,8 @@ class Discord(Webhook):
         self._format = 'json'
         self._retries = 1
         self._retry_delay = 0.1
-
-    def cleanup(self) -> None:
-        """
-        Cleanup pending module resources.
-        This will do nothing for webhooks, they will simply not be called anymore
-        """
-        pass
+        self._timeout = 10
+        self._start_sender('Discord')
 
     def send_msg(self, msg) -> None:
 
@@ -51,7 +46,7 @@ class Discord(Webhook):
             }]
             for f in fields:
                 for k, v in f.items():
-                    v = v.format(**msg)
+                    v = v.format_map(msg)
                     embeds[0]['fields'].append(
                         {'name': k, 'value': v, 'inline': True})
 
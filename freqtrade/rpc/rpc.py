@@ -1060,7 +1060,7 @@ class RPC:
 
             dataframe.loc[:, '__date_ts'] = dataframe.loc[:, 'date'].view(int64) // 1000 // 1000
             # Move signal close to separate column when signal for easy plotting
-            for sig_type in signals.keys():
+            for sig_type in signals:
                 if sig_type in dataframe.columns:
                     mask = (dataframe[sig_type] == 1)
                     signals[sig_type] = int(mask.sum())
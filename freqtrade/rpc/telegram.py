@@ -5,21 +5,25 @@ This module manage Telegram communication
 """
 import json
 import logging
+import random
 import re
-from copy import deepcopy
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from functools import partial
 from html import escape
 from itertools import chain
 from math import isnan
-from typing import Any, Callable, Dict, List, Optional, Union
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple, Union
 
 import arrow
 from tabulate import tabulate
 from telegram import (MAX_MESSAGE_LENGTH, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup,
                       KeyboardButton, ParseMode, ReplyKeyboardMarkup, Update)
-from telegram.error import BadRequest, NetworkError, TelegramError
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
 from telegram.ext import CallbackContext, CallbackQueryHandler, CommandHandler, Updater
 from telegram.utils.helpers import escape_markdown
 
@@ -37,6 +41,31 @@ logger = logging.getLogger(__name__)
 
 logger.debug('Included module rpc.telegram ...')
 
+MAX_SEND_QUEUE_SIZE = 1024
+SEND_MSG_ATTEMPTS = 3
+SEND_MSG_MIN_BACKOFF = 0.5
+SEND_MSG_MAX_BACKOFF = 5
+# Longer flood control waits drop the message instead of blocking the sender.
+SEND_MSG_MAX_RETRY_AFTER = 30
+GROUP_MESSAGES_PER_MINUTE = 20
+NOTIFICATION_BATCH_WINDOW = 0.5
+SENDER_STOP_TIMEOUT = 30
+
+_ENTRY_SIDES = {
+    'Long': {'enter': 'Long', 'entered': 'Longed'},
+    'Short': {'enter': 'Short', 'entered': 'Shorted'},
+}
+_ENTRY_EMOJI = {True: '\N{CHECK MARK}', False: '\N{LARGE BLUE CIRCLE}'}
+# (minimum profit percent, emoji) - checked in order
+_EXIT_PROFIT_EMOJI = ((5.0, '\N{ROCKET}'), (0.0, '\N{EIGHT SPOKED ASTERISK}'))
+# Keyed by (is_sub_trade, is_sub_profit)
+_PROFIT_PREFIX = {
+    (True, True): 'Sub ',
+    (True, False): 'Cumulative ',
+    (False, True): '',
+    (False, False): '',
+}
+
 
 @dataclass
 class TimeunitMappings:
@@ -64,7 +93,7 @@ def authorized_only(command_handler: Callable[..., None]) -> Callable[..., Any]:
         else:
             cchat_id = int(update.message.chat_id)
 
-        chat_id = int(self._config['telegram']['chat_id'])
+        chat_id = int(self._chat_id)
         if cchat_id != chat_id:
             logger.info(
                 'Rejected unauthorized message from: %s',
@@ -103,6 +132,33 @@ class Telegram(RPCHandler):
         super().__init__(rpc, config)
 
         self._updater: Updater
+        self._sender: Thread
+        self._stopping = Event()
+        self._send_queue: Queue = Queue(maxsize=MAX_SEND_QUEUE_SIZE)
+        self._chat_id = self._config['telegram']['chat_id']
+        self._is_group_chat = str(self._chat_id).startswith('-')
+        self._sent_times: Deque[float] = deque(maxlen=GROUP_MESSAGES_PER_MINUTE)
+        self._exchange_suffix = ' (dry)' if self._config['dry_run'] else ''
+        self._batch_notifications: bool = self._config['telegram'].get(
+            'batch_notifications', False)
+        self._notification_settings: Dict[str, Any] = self._config['telegram'].get(
+            'notification_settings', {})
+        self._show_candle: str = self._notification_settings.get('show_candle', 'off')
+        self._formatters: Dict[RPCMessageType, Callable[[Mapping[str, Any]], str]] = {
+            RPCMessageType.ENTRY: self._format_entry_msg,
+            RPCMessageType.ENTRY_FILL: self._format_entry_msg,
+            RPCMessageType.EXIT: self._format_exit_msg,
+            RPCMessageType.EXIT_FILL: self._format_exit_msg,
+            RPCMessageType.ENTRY_CANCEL: self._format_cancel_msg,
+            RPCMessageType.EXIT_CANCEL: self._format_cancel_msg,
+            RPCMessageType.PROTECTION_TRIGGER: self._format_protection_msg,
+            RPCMessageType.PROTECTION_TRIGGER_GLOBAL: self._format_protection_global_msg,
+            RPCMessageType.STATUS: self._format_status_msg,
+            RPCMessageType.WARNING: self._format_warning_msg,
+            RPCMessageType.EXCEPTION: self._format_exception_msg,
+            RPCMessageType.STARTUP: self._format_startup_msg,
+            RPCMessageType.STRATEGY_MSG: self._format_strategy_msg,
+        }
         self._init_keyboard()
         self._init()
 
@@ -152,8 +208,7 @@ class Telegram(RPCHandler):
                 raise OperationalException(err_msg)
             else:
                 self._keyboard = cust_keyboard
-                logger.info('using custom keyboard from '
-                            f'config.json: {self._keyboard}')
+                logger.info('using custom keyboard from config.json: %s', self._keyboard)
 
     def _init(self) -> None:
         """
@@ -236,105 +291,186 @@ class Telegram(RPCHandler):
             'rpc.telegram is listening for following commands: %s',
             [h.command for h in handles]
         )
+        self._sender = Thread(target=self._process_send_queue, name='TelegramSender',
+                              daemon=True)
+        self._sender.start()
 
     def cleanup(self) -> None:
         """
         Stops all running telegram threads.
         :return: None
         """
+        # Send out pending notifications (e.g. the shutdown message) before stopping,
+        # without waiting for the group chat rate limit.
+        self._stopping.set()
+        try:
+            self._send_queue.put(None, timeout=1)
+        except Full:
+            # The sender stops by itself once the queue is empty.
+            pass
+        self._sender.join(timeout=SENDER_STOP_TIMEOUT)
+        if self._sender.is_alive():
+            logger.warning('Telegram sender did not stop within %s seconds.',
+                           SENDER_STOP_TIMEOUT)
         # This can take up to `timeout` from the call to `start_polling`.
         self._updater.stop()
 
-    def _exchange_from_msg(self, msg: Dict[str, Any]) -> str:
+    def _queue_msg(self, msg: str, disable_notification: bool = False) -> None:
+        """
+        Hand a notification over to the sender thread.
+        Drops the message if telegram can't keep up and the queue is full.
+        """
+        try:
+            self._send_queue.put((msg, disable_notification), timeout=0.05)
+        except Full:
+            logger.warning('Telegram send queue is full, dropping message.')
+
+    def _process_send_queue(self) -> None:
+        """
+        Sends queued notifications until a `None` sentinel is received,
+        or until the queue runs empty during shutdown.
+        Runs in its own thread, so slow telegram responses don't block the bot.
+        """
+        running = True
+        while running:
+            batch = [self._send_queue.get()]
+            if self._batch_notifications:
+                batch.extend(self._drain_send_queue())
+            running = None not in batch and not (
+                self._stopping.is_set() and self._send_queue.empty())
+            messages = [item for item in batch if item is not None]
+
+            for msg, disable_notification in self._merge_messages(messages):
+                self._wait_for_send_slot()
+                try:
+                    self._send_msg(msg, disable_notification=disable_notification)
+                except Exception:
+                    logger.exception('Exception occurred while sending telegram message')
+
+    def _wait_for_send_slot(self) -> None:
+        """
+        Telegram allows group chats only GROUP_MESSAGES_PER_MINUTE messages per minute.
+        Pace sending instead of running into flood control.
+        Shutdown interrupts the wait, so pending messages can go out right away.
+        """
+        if not self._is_group_chat or self._stopping.is_set():
+            return
+        if len(self._sent_times) == GROUP_MESSAGES_PER_MINUTE:
+            wait = self._sent_times[0] + 60 - time.monotonic()
+            if wait > 0 and self._stopping.wait(wait):
+                return
+        self._sent_times.append(time.monotonic())
+
+    def _drain_send_queue(self) -> List[Optional[Tuple[str, bool]]]:
+        """
+        Collect the messages arriving within NOTIFICATION_BATCH_WINDOW seconds,
+        so bursts (e.g. many trades exiting at once) end up in one telegram message.
+        """
+        items: List[Optional[Tuple[str, bool]]] = []
+        deadline = time.monotonic() + NOTIFICATION_BATCH_WINDOW
+        try:
+            while True:
+                item = self._send_queue.get(timeout=max(deadline - time.monotonic(), 0))
+                items.append(item)
+                if item is None:
+                    # Shutting down - don't wait for more.
+                    break
+        except Empty:
+            pass
+        return items
+
+    @staticmethod
+    def _merge_messages(batch: List[Tuple[str, bool]]) -> List[Tuple[str, bool]]:
+        """
+        Merge consecutive messages with the same notification setting,
+        as long as the result still fits into one telegram message.
+        """
+        merged: List[Tuple[str, bool]] = []
+        for msg, disable_notification in batch:
+            if merged:
+                last_msg, last_disable = merged[-1]
+                if (last_disable == disable_notification
+                        and len(last_msg) + len(msg) + 2 <= MAX_MESSAGE_LENGTH):
+                    merged[-1] = (f"{last_msg}\n\n{msg}", disable_notification)
+                    continue
+            merged.append((msg, disable_notification))
+        return merged
+
+    def _exchange_from_msg(self, msg: Mapping[str, Any]) -> str:
         """
         Extracts the exchange name from the given message.
         :param msg: The message to extract the exchange name from.
         :return: The exchange name.
         """
-        return f"{msg['exchange']}{' (dry)' if self._config['dry_run'] else ''}"
+        return f"{msg['exchange']}{self._exchange_suffix}"
 
     def _add_analyzed_candle(self, pair: str) -> str:
-        candle_val = self._config['telegram'].get(
-            'notification_settings', {}).get('show_candle', 'off')
-        if candle_val != 'off':
-            if candle_val == 'ohlc':
-                analyzed_df, _ = self._rpc._freqtrade.dataprovider.get_analyzed_dataframe(
-                    pair, self._config['timeframe'])
-                candle = analyzed_df.iloc[-1].squeeze() if len(analyzed_df) > 0 else None
-                if candle is not None:
-                    return (
-                        f"*Candle OHLC*: `{candle['open']}, {candle['high']}, "
-                        f"{candle['low']}, {candle['close']}`\n"
-                    )
-
-        return ''
-
-    def _format_entry_msg(self, msg: Dict[str, Any]) -> str:
-        if self._rpc._fiat_converter:
-            msg['stake_amount_fiat'] = self._rpc._fiat_converter.convert_amount(
-                msg['stake_amount'], msg['stake_currency'], msg['fiat_currency'])
-        else:
-            msg['stake_amount_fiat'] = 0
-        is_fill = msg['type'] in [RPCMessageType.ENTRY_FILL]
-        emoji = '\N{CHECK MARK}' if is_fill else '\N{LARGE BLUE CIRCLE}'
+        if self._show_candle != 'ohlc':
+            return ''
+        analyzed_df, _ = self._rpc._freqtrade.dataprovider.get_analyzed_dataframe(
+            pair, self._config['timeframe'])
+        if len(analyzed_df) == 0:
+            return ''
+        return (
+            f"*Candle OHLC*: `{analyzed_df['open'].iat[-1]}, {analyzed_df['high'].iat[-1]}, "
+            f"{analyzed_df['low'].iat[-1]}, {analyzed_df['close'].iat[-1]}`\n"
+        )
 
-        entry_side = ({'enter': 'Long', 'entered': 'Longed'} if msg['direction'] == 'Long'
-                      else {'enter': 'Short', 'entered': 'Shorted'})
-        message = (
+    def _format_entry_msg(self, msg: Mapping[str, Any]) -> str:
+        is_fill = msg['type'] in [RPCMessageType.ENTRY_FILL]
+        emoji = _ENTRY_EMOJI[is_fill]
+        entry_side = _ENTRY_SIDES[msg['direction']]
+        enter_tag_text = f"*Enter Tag:* `{msg['enter_tag']}`\n" if msg.get('enter_tag') else ""
+        leverage_text = (f"*Leverage:* `{msg['leverage']}`\n"
+                         if msg.get('leverage') and msg.get('leverage', 1.0) != 1.0 else "")
+        current_rate_text = (f"*Current Rate:* `{msg['current_rate']:.8f}`\n"
+                             if msg['type'] == RPCMessageType.ENTRY else "")
+        fiat_text = (f", {round_coin_value(self._stake_amount_fiat(msg), msg['fiat_currency'])}"
+                     if msg.get('fiat_currency') else "")
+
+        return (
             f"{emoji} *{self._exchange_from_msg(msg)}:*"
             f" {entry_side['entered'] if is_fill else entry_side['enter']} {msg['pair']}"
             f" (#{msg['trade_id']})\n"
+            f"{self._add_analyzed_candle(msg['pair'])}"
+            f"{enter_tag_text}"
+            f"*Amount:* `{msg['amount']:.8f}`\n"
+            f"{leverage_text}"
+            f"*Open Rate:* `{msg['open_rate']:.8f}`\n"
+            f"{current_rate_text}"
+            f"*Total:* `({round_coin_value(msg['stake_amount'], msg['stake_currency'])}"
+            f"{fiat_text})`"
         )
-        message += self._add_analyzed_candle(msg['pair'])
-        message += f"*Enter Tag:* `{msg['enter_tag']}`\n" if msg.get('enter_tag') else ""
-        message += f"*Amount:* `{msg['amount']:.8f}`\n"
-        if msg.get('leverage') and msg.get('leverage', 1.0) != 1.0:
-            message += f"*Leverage:* `{msg['leverage']}`\n"
-
-        if msg['type'] in [RPCMessageType.ENTRY_FILL]:
-            message += f"*Open Rate:* `{msg['open_rate']:.8f}`\n"
-        elif msg['type'] in [RPCMessageType.ENTRY]:
-            message += f"*Open Rate:* `{msg['open_rate']:.8f}`\n"\
-                       f"*Current Rate:* `{msg['current_rate']:.8f}`\n"
-
-        message += f"*Total:* `({round_coin_value(msg['stake_amount'], msg['stake_currency'])}"
-
-        if msg.get('fiat_currency'):
-            message += f", {round_coin_value(msg['stake_amount_fiat'], msg['fiat_currency'])}"
 
-        message += ")`"
-        return message
-
-    def _format_exit_msg(self, msg: Dict[str, Any]) -> str:
-        msg['amount'] = round(msg['amount'], 8)
-        msg['profit_percent'] = round(msg['profit_ratio'] * 100, 2)
-        msg['duration'] = msg['close_date'].replace(
-            microsecond=0) - msg['open_date'].replace(microsecond=0)
-        msg['duration_min'] = msg['duration'].total_seconds() / 60
+    def _stake_amount_fiat(self, msg: Mapping[str, Any]) -> float:
+        if self._rpc._fiat_converter:
+            return self._rpc._fiat_converter.convert_amount(
+                msg['stake_amount'], msg['stake_currency'], msg['fiat_currency'])
+        return 0
 
-        msg['enter_tag'] = msg['enter_tag'] if "enter_tag" in msg.keys() else None
-        msg['emoji'] = self._get_sell_emoji(msg)
-        msg['leverage_text'] = (f"*Leverage:* `{msg['leverage']:.1f}`\n"
-                                if msg.get('leverage') and msg.get('leverage', 1.0) != 1.0
-                                else "")
+    def _format_exit_msg(self, msg: Mapping[str, Any]) -> str:
+        profit_percent = round(msg['profit_ratio'] * 100, 2)
+        duration_sec = int((msg['close_date'] - msg['open_date']).total_seconds())
+        leverage_text = (f"*Leverage:* `{msg['leverage']:.1f}`\n"
+                         if msg.get('leverage') and msg.get('leverage', 1.0) != 1.0
+                         else "")
 
         # Check if all sell properties are available.
         # This might not be the case if the message origin is triggered by /forceexit
+        profit_fiat_text = ''
         if (all(prop in msg for prop in ['gain', 'fiat_currency', 'stake_currency'])
                 and self._rpc._fiat_converter):
-            msg['profit_fiat'] = self._rpc._fiat_converter.convert_amount(
+            profit_fiat = self._rpc._fiat_converter.convert_amount(
                 msg['profit_amount'], msg['stake_currency'], msg['fiat_currency'])
-            msg['profit_extra'] = f" / {msg['profit_fiat']:.3f} {msg['fiat_currency']}"
-        else:
-            msg['profit_extra'] = ''
-        msg['profit_extra'] = (
+            profit_fiat_text = f" / {profit_fiat:.3f} {msg['fiat_currency']}"
+        profit_extra = (
             f" ({msg['gain']}: {msg['profit_amount']:.8f} {msg['stake_currency']}"
-            f"{msg['profit_extra']})")
+            f"{profit_fiat_text})")
 
         is_fill = msg['type'] == RPCMessageType.EXIT_FILL
         is_sub_trade = msg.get('sub_trade')
         is_sub_profit = msg['profit_amount'] != msg.get('cumulative_profit')
-        profit_prefix = ('Sub ' if is_sub_profit else 'Cumulative ') if is_sub_trade else ''
+        profit_prefix = _PROFIT_PREFIX[(bool(is_sub_trade), is_sub_profit)]
         cp_extra = ''
         exit_wording = 'Exited' if is_fill else 'Exiting'
         if is_sub_profit and is_sub_trade:
@@ -349,16 +485,17 @@ class Telegram(RPCHandler):
             )
 
         message = (
-            f"{msg['emoji']} *{self._exchange_from_msg(msg)}:* "
+            f"{self._get_sell_emoji(profit_percent, msg['exit_reason'])} "
+            f"*{self._exchange_from_msg(msg)}:* "
             f"{exit_wording} {msg['pair']} (#{msg['trade_id']})\n"
             f"{self._add_analyzed_candle(msg['pair'])}"
             f"*{f'{profit_prefix}Profit' if is_fill else f'Unrealized {profit_prefix}Profit'}:* "
-            f"`{msg['profit_ratio']:.2%}{msg['profit_extra']}`\n"
+            f"`{msg['profit_ratio']:.2%}{profit_extra}`\n"
             f"{cp_extra}"
-            f"*Enter Tag:* `{msg['enter_tag']}`\n"
+            f"*Enter Tag:* `{msg.get('enter_tag')}`\n"
             f"*Exit Reason:* `{msg['exit_reason']}`\n"
             f"*Direction:* `{msg['direction']}`\n"
-            f"{msg['leverage_text']}"
+            f"{leverage_text}"
             f"*Amount:* `{msg['amount']:.8f}`\n"
             f"*Open Rate:* `{msg['open_rate']:.8f}`\n"
         )
@@ -370,65 +507,60 @@ class Telegram(RPCHandler):
         elif msg['type'] == RPCMessageType.EXIT_FILL:
             message += f"*Exit Rate:* `{msg['close_rate']:.8f}`"
         if is_sub_trade:
-            if self._rpc._fiat_converter:
-                msg['stake_amount_fiat'] = self._rpc._fiat_converter.convert_amount(
-                    msg['stake_amount'], msg['stake_currency'], msg['fiat_currency'])
-            else:
-                msg['stake_amount_fiat'] = 0
             rem = round_coin_value(msg['stake_amount'], msg['stake_currency'])
             message += f"\n*Remaining:* `({rem}"
 
             if msg.get('fiat_currency', None):
-                message += f", {round_coin_value(msg['stake_amount_fiat'], msg['fiat_currency'])}"
+                stake_amount_fiat = self._stake_amount_fiat(msg)
+                message += f", {round_coin_value(stake_amount_fiat, msg['fiat_currency'])}"
 
             message += ")`"
         else:
-            message += f"\n*Duration:* `{msg['duration']} ({msg['duration_min']:.1f} min)`"
+            message += (f"\n*Duration:* `{timedelta(seconds=duration_sec)} "
+                        f"({duration_sec / 60:.1f} min)`")
         return message
 
-    def compose_message(self, msg: Dict[str, Any], msg_type: RPCMessageType) -> Optional[str]:
-        if msg_type in [RPCMessageType.ENTRY, RPCMessageType.ENTRY_FILL]:
-            message = self._format_entry_msg(msg)
+    def _format_cancel_msg(self, msg: Mapping[str, Any]) -> str:
+        message_side = 'enter' if msg['type'] == RPCMessageType.ENTRY_CANCEL else 'exit'
+        return (f"\N{WARNING SIGN} *{self._exchange_from_msg(msg)}:* "
+                f"Cancelling {'partial ' if msg.get('sub_trade') else ''}"
+                f"{message_side} Order for {msg['pair']} "
+                f"(#{msg['trade_id']}). Reason: {msg['reason']}.")
+
+    def _format_protection_msg(self, msg: Mapping[str, Any]) -> str:
+        return (
+            f"*Protection* triggered due to {msg['reason']}. "
+            f"`{msg['pair']}` will be locked until `{msg['lock_end_time']}`."
+        )
 
-        elif msg_type in [RPCMessageType.EXIT, RPCMessageType.EXIT_FILL]:
-            message = self._format_exit_msg(msg)
+    def _format_protection_global_msg(self, msg: Mapping[str, Any]) -> str:
+        return (
+            f"*Protection* triggered due to {msg['reason']}. "
+            f"*All pairs* will be locked until `{msg['lock_end_time']}`."
+        )
 
-        elif msg_type in (RPCMessageType.ENTRY_CANCEL, RPCMessageType.EXIT_CANCEL):
-            msg['message_side'] = 'enter' if msg_type in [RPCMessageType.ENTRY_CANCEL] else 'exit'
-            message = (f"\N{WARNING SIGN} *{self._exchange_from_msg(msg)}:* "
-                       f"Cancelling {'partial ' if msg.get('sub_trade') else ''}"
-                       f"{msg['message_side']} Order for {msg['pair']} "
-                       f"(#{msg['trade_id']}). Reason: {msg['reason']}.")
+    def _format_status_msg(self, msg: Mapping[str, Any]) -> str:
+        return f"*Status:* `{msg['status']}`"
 
-        elif msg_type == RPCMessageType.PROTECTION_TRIGGER:
-            message = (
-                f"*Protection* triggered due to {msg['reason']}. "
-                f"`{msg['pair']}` will be locked until `{msg['lock_end_time']}`."
-            )
+    def _format_warning_msg(self, msg: Mapping[str, Any]) -> str:
+        return f"\N{WARNING SIGN} *Warning:* `{msg['status']}`"
 
-        elif msg_type == RPCMessageType.PROTECTION_TRIGGER_GLOBAL:
-            message = (
-                f"*Protection* triggered due to {msg['reason']}. "
-                f"*All pairs* will be locked until `{msg['lock_end_time']}`."
-            )
+    def _format_exception_msg(self, msg: Mapping[str, Any]) -> str:
+        # Errors will contain exceptions, which are wrapped in tripple ticks.
+        return f"\N{WARNING SIGN} *ERROR:* \n {msg['status']}"
 
-        elif msg_type == RPCMessageType.STATUS:
-            message = f"*Status:* `{msg['status']}`"
+    def _format_startup_msg(self, msg: Mapping[str, Any]) -> str:
+        return f"{msg['status']}"
 
-        elif msg_type == RPCMessageType.WARNING:
-            message = f"\N{WARNING SIGN} *Warning:* `{msg['status']}`"
-        elif msg_type == RPCMessageType.EXCEPTION:
-            # Errors will contain exceptions, which are wrapped in tripple ticks.
-            message = f"\N{WARNING SIGN} *ERROR:* \n {msg['status']}"
+    def _format_strategy_msg(self, msg: Mapping[str, Any]) -> str:
+        return f"{msg['msg']}"
 
-        elif msg_type == RPCMessageType.STARTUP:
-            message = f"{msg['status']}"
-        elif msg_type == RPCMessageType.STRATEGY_MSG:
-            message = f"{msg['msg']}"
-        else:
+    def compose_message(self, msg: Mapping[str, Any], msg_type: RPCMessageType) -> Optional[str]:
+        formatter = self._formatters.get(msg_type)
+        if formatter is None:
             logger.debug("Unknown message type: %s", msg_type)
             return None
-        return message
+        return formatter(msg)
 
     def send_msg(self, msg: RPCSendMsg) -> None:
         """ Send a message to telegram channel """
@@ -438,36 +570,32 @@ class Telegram(RPCHandler):
         msg_type = msg['type']
         noti = ''
         if msg['type'] == RPCMessageType.EXIT:
-            sell_noti = self._config['telegram'] \
-                .get('notification_settings', {}).get(str(msg_type), {})
+            sell_noti = self._notification_settings.get(msg_type, {})
             # For backward compatibility sell still can be string
             if isinstance(sell_noti, str):
                 noti = sell_noti
             else:
                 noti = sell_noti.get(str(msg['exit_reason']), default_noti)
         else:
-            noti = self._config['telegram'] \
-                .get('notification_settings', {}).get(str(msg_type), default_noti)
+            noti = self._notification_settings.get(msg_type, default_noti)
 
         if noti == 'off':
-            logger.info(f"Notification '{msg_type}' not sent.")
+            logger.info("Notification '%s' not sent.", msg_type)
             # Notification disabled
             return
 
-        message = self.compose_message(deepcopy(msg), msg_type)  # type: ignore
+        message = self.compose_message(msg, msg_type)
         if message:
-            self._send_msg(message, disable_notification=(noti == 'silent'))
+            self._queue_msg(message, disable_notification=(noti == 'silent'))
 
-    def _get_sell_emoji(self, msg):
+    def _get_sell_emoji(self, profit_percent: float, exit_reason: str) -> str:
         """
         Get emoji for sell-side
         """
-
-        if float(msg['profit_percent']) >= 5.0:
-            return "\N{ROCKET}"
-        elif float(msg['profit_percent']) >= 0.0:
-            return "\N{EIGHT SPOKED ASTERISK}"
-        elif msg['exit_reason'] == "stop_loss":
+        for threshold, emoji in _EXIT_PROFIT_EMOJI:
+            if profit_percent >= threshold:
+                return emoji
+        if exit_reason == "stop_loss":
             return "\N{WARNING SIGN}"
         else:
             return "\N{CROSS MARK}"
@@ -518,8 +646,8 @@ class Telegram(RPCHandler):
 
                 lines.append(f"*{wording} #{order_nr}:* at {minus_on_entry:.2%} avg Profit")
                 if is_open:
-                    lines.append("({})".format(cur_entry_datetime
-                                               .humanize(granularity=["day", "hour", "minute"])))
+                    lines.append(
+                        f"({cur_entry_datetime.humanize(granularity=['day', 'hour', 'minute'])})")
                 lines.append(f"*Amount:* {cur_entry_amount} "
                              f"({round_coin_value(order['cost'], quote_currency)})")
                 lines.append(f"*Average {wording} Price:* {cur_entry_average} "
@@ -651,10 +779,10 @@ class Telegram(RPCHandler):
                 if (len(msg) + len(line) + 1) < MAX_MESSAGE_LENGTH:
                     msg += line + '\n'
                 else:
-                    self._send_msg(msg.format(**r))
+                    self._send_msg(msg.format_map(r))
                     msg = "*Trade ID:* `{trade_id}` - continued\n" + line + '\n'
 
-        self._send_msg(msg.format(**r))
+        self._send_msg(msg.format_map(r))
 
     @authorized_only
     def _status_table(self, update: Update, context: CallbackContext) -> None:
@@ -1694,34 +1822,61 @@ class Telegram(RPCHandler):
                 reply_markup = InlineKeyboardMarkup(keyboard, resize_keyboard=True)
             else:
                 reply_markup = ReplyKeyboardMarkup(self._keyboard, resize_keyboard=True)
-        try:
+        self._send_with_retry(msg, parse_mode, reply_markup, disable_notification)
+
+    def _send_with_retry(
+            self, msg: str, parse_mode: str,
+            reply_markup: Union[InlineKeyboardMarkup, ReplyKeyboardMarkup],
+            disable_notification: bool) -> None:
+        """
+        Send the message, retrying transient errors with backoff.
+        """
+        send_parse_mode: Optional[str] = parse_mode
+        send_message = self._updater.bot.send_message
+        for attempt in range(SEND_MSG_ATTEMPTS):
             try:
-                self._updater.bot.send_message(
-                    self._config['telegram']['chat_id'],
+                send_message(
+                    self._chat_id,
                     text=msg,
-                    parse_mode=parse_mode,
+                    parse_mode=send_parse_mode,
                     reply_markup=reply_markup,
                     disable_notification=disable_notification,
                 )
+                return
+            except RetryAfter as retry_err:
+                # Flood control - telegram tells us how long to wait.
+                if retry_err.retry_after > SEND_MSG_MAX_RETRY_AFTER:
+                    logger.warning('Telegram RetryAfter: retry in %s seconds! '
+                                   'Giving up on that message.', retry_err.retry_after)
+                    return
+                logger.warning('Telegram RetryAfter: retry in %s seconds.', retry_err.retry_after)
+                delay: float = retry_err.retry_after
+            except BadRequest as bad_request:
+                if send_parse_mode and 'parse entities' in bad_request.message.lower():
+                    # Markdown / HTML could not be parsed - fall back to plain text.
+                    logger.warning('TelegramError: %s! Sending as plain text.',
+                                   bad_request.message)
+                    send_parse_mode = None
+                    continue
+                logger.warning('TelegramError: %s! Giving up on that message.',
+                               bad_request.message)
+                return
             except NetworkError as network_err:
                 # Sometimes the telegram server resets the current connection,
                 # if this is the case we send the message again.
-                logger.warning(
-                    'Telegram NetworkError: %s! Trying one more time.',
-                    network_err.message
-                )
-                self._updater.bot.send_message(
-                    self._config['telegram']['chat_id'],
-                    text=msg,
-                    parse_mode=parse_mode,
-                    reply_markup=reply_markup,
-                    disable_notification=disable_notification,
-                )
-        except TelegramError as telegram_err:
-            logger.warning(
-                'TelegramError: %s! Giving up on that message.',
-                telegram_err.message
-            )
+                logger.warning('Telegram NetworkError: %s!', network_err.message)
+                delay = min(SEND_MSG_MAX_BACKOFF, SEND_MSG_MIN_BACKOFF * 2 ** attempt)
+                delay *= 1 + random.uniform(-0.1, 0.1)
+            except TelegramError as telegram_err:
+                logger.warning('TelegramError: %s! Giving up on that message.',
+                               telegram_err.message)
+                return
+            if attempt < SEND_MSG_ATTEMPTS - 1:
+                # No point in waiting after the last attempt - or when shutting down.
+                if self._stopping.wait(delay):
+                    logger.warning('Telegram is shutting down, giving up on that message.')
+                    return
+        logger.warning('Telegram message could not be sent after %s attempts.', SEND_MSG_ATTEMPTS)
 
     @authorized_only
     def _changemarketdir(self, update: Update, context: CallbackContext) -> None:
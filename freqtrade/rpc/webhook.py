@@ -3,9 +3,12 @@ This module manages webhook communication
 """
 import logging
 import time
+from queue import Empty, Full, Queue
+from threading import Thread
 from typing import Any, Dict, Optional
 
-from requests import RequestException, post
+import orjson
+from requests import RequestException, Session
 
 from freqtrade.constants import Config
 from freqtrade.enums import RPCMessageType
@@ -17,6 +20,22 @@ logger = logging.getLogger(__name__)
 
 logger.debug('Included module rpc.webhook ...')
 
+MAX_SEND_QUEUE_SIZE = 1024
+SENDER_STOP_TIMEOUT = 30
+
+DEPRECATED_WEBHOOK_KEYS = {
+    RPCMessageType.ENTRY: 'webhookentry',
+    RPCMessageType.ENTRY_CANCEL: 'webhookentrycancel',
+    RPCMessageType.ENTRY_FILL: 'webhookentryfill',
+    RPCMessageType.EXIT: 'webhookexit',
+    RPCMessageType.EXIT_FILL: 'webhookexitfill',
+    RPCMessageType.EXIT_CANCEL: 'webhookexitcancel',
+    RPCMessageType.STATUS: 'webhookstatus',
+    RPCMessageType.STARTUP: 'webhookstatus',
+    RPCMessageType.EXCEPTION: 'webhookstatus',
+    RPCMessageType.WARNING: 'webhookstatus',
+}
+
 
 class Webhook(RPCHandler):
     """  This class handles all webhook communication """
@@ -30,51 +49,75 @@ class Webhook(RPCHandler):
         """
         super().__init__(rpc, config)
 
-        self._url = self._config['webhook']['url']
-        self._format = self._config['webhook'].get('format', 'form')
-        self._retries = self._config['webhook'].get('retries', 0)
-        self._retry_delay = self._config['webhook'].get('retry_delay', 0.1)
+        self._webhook_config = self._config['webhook']
+        self._url = self._webhook_config['url']
+        self._format = self._webhook_config.get('format', 'form')
+        self._retries = self._webhook_config.get('retries', 0)
+        self._retry_delay = self._webhook_config.get('retry_delay', 0.1)
+        self._timeout = self._webhook_config.get('timeout', 10)
+        self._start_sender('Webhook')
+
+    def _start_sender(self, name: str) -> None:
+        """
+        Start the thread doing the actual http calls.
+        Connections are reused (keep-alive) across messages.
+        """
+        self._session = Session()
+        self._send_queue: Queue = Queue(maxsize=MAX_SEND_QUEUE_SIZE)
+        self._sender = Thread(target=self._process_send_queue, name=name, daemon=True)
+        self._sender.start()
 
     def cleanup(self) -> None:
         """
         Cleanup pending module resources.
-        This will do nothing for webhooks, they will simply not be called anymore
+        Tries to send outstanding messages for up to SENDER_STOP_TIMEOUT seconds,
+        drops the rest and closes the pooled http connections.
+        """
+        try:
+            self._send_queue.put(None, timeout=1)
+        except Full:
+            # Sender is stuck - dropping the backlog below lets it stop.
+            pass
+        self._sender.join(timeout=SENDER_STOP_TIMEOUT)
+        if self._sender.is_alive():
+            dropped = self._drop_pending()
+            logger.warning('Webhook sender did not stop within %s seconds, dropped %s messages.',
+                           SENDER_STOP_TIMEOUT, dropped)
+            # Stop the sender once the current call returns.
+            self._send_queue.put_nowait(None)
+        self._session.close()
+
+    def _drop_pending(self) -> int:
+        """
+        Remove all messages waiting in the send queue.
         """
-        pass
+        dropped = 0
+        try:
+            while True:
+                if self._send_queue.get_nowait() is not None:
+                    dropped += 1
+        except Empty:
+            pass
+        return dropped
+
+    def _process_send_queue(self) -> None:
+        """
+        Sends queued messages until a `None` sentinel is received.
+        Runs in its own thread, so slow or unreachable endpoints don't block the bot.
+        """
+        while True:
+            post_kwargs = self._send_queue.get()
+            if post_kwargs is None:
+                break
+            self._post(post_kwargs)
 
     def _get_value_dict(self, msg: RPCSendMsg) -> Optional[Dict[str, Any]]:
-        whconfig = self._config['webhook']
         # Deprecated 2022.10 - only keep generic method.
-        if msg['type'] in [RPCMessageType.ENTRY]:
-            valuedict = whconfig.get('webhookentry')
-        elif msg['type'] in [RPCMessageType.ENTRY_CANCEL]:
-            valuedict = whconfig.get('webhookentrycancel')
-        elif msg['type'] in [RPCMessageType.ENTRY_FILL]:
-            valuedict = whconfig.get('webhookentryfill')
-        elif msg['type'] == RPCMessageType.EXIT:
-            valuedict = whconfig.get('webhookexit')
-        elif msg['type'] == RPCMessageType.EXIT_FILL:
-            valuedict = whconfig.get('webhookexitfill')
-        elif msg['type'] == RPCMessageType.EXIT_CANCEL:
-            valuedict = whconfig.get('webhookexitcancel')
-        elif msg['type'] in (RPCMessageType.STATUS,
-                             RPCMessageType.STARTUP,
-                             RPCMessageType.EXCEPTION,
-                             RPCMessageType.WARNING):
-            valuedict = whconfig.get('webhookstatus')
-        elif msg['type'].value in whconfig:
-            # Allow all types ...
-            valuedict = whconfig.get(msg['type'].value)
-        elif msg['type'] in (
-                RPCMessageType.PROTECTION_TRIGGER,
-                RPCMessageType.PROTECTION_TRIGGER_GLOBAL,
-                RPCMessageType.WHITELIST,
-                RPCMessageType.ANALYZED_DF,
-                RPCMessageType.NEW_CANDLE,
-                RPCMessageType.STRATEGY_MSG):
-            # Don't fail for non-implemented types
-            return None
-        return valuedict
+        deprecated_key = DEPRECATED_WEBHOOK_KEYS.get(msg['type'])
+        if deprecated_key:
+            return self._webhook_config.get(deprecated_key)
+        # Allow all types ...
+        return self._webhook_config.get(msg['type'].value)
 
     def send_msg(self, msg: RPCSendMsg) -> None:
         """ Send a message to telegram channel """
@@ -86,39 +129,59 @@ class Webhook(RPCHandler):
                 logger.info("Message type '%s' not configured for webhooks", msg['type'])
                 return
 
-            payload = {key: value.format(**msg) for (key, value) in valuedict.items()}
+            payload = {key: value.format_map(msg) for (key, value) in valuedict.items()}
             self._send_msg(payload)
         except KeyError as exc:
             logger.exception("Problem calling Webhook. Please check your webhook configuration. "
                              "Exception: %s", exc)
 
     def _send_msg(self, payload: dict) -> None:
+        """
+        Hand the payload to the sender thread, so a slow or unreachable
+        endpoint doesn't block the bot. Messages are sent in order.
+        Configuration errors are raised here, on the caller's thread.
+        """
+        post_kwargs = self._get_post_kwargs(payload)
+        try:
+            self._send_queue.put(post_kwargs, timeout=0.05)
+        except Full:
+            logger.warning('Webhook send queue is full, dropping message.')
+
+    def _get_post_kwargs(self, payload: dict) -> Dict[str, Any]:
+        """Build the request arguments for the configured format"""
+        if self._format == 'form':
+            return {'data': payload}
+        elif self._format == 'json':
+            return {'data': orjson.dumps(payload),
+                    'headers': {'Content-Type': 'application/json'}}
+        elif self._format == 'raw':
+            return {'data': payload['data'], 'headers': {'Content-Type': 'text/plain'}}
+        else:
+            raise NotImplementedError(f'Unknown format: {self._format}')
+
+    def _post(self, post_kwargs: Dict[str, Any]) -> None:
         """do the actual call to the webhook"""
-
-        success = False
-        attempts = 0
-        while not success and attempts <= self._retries:
-            if attempts:
-                if self._retry_delay:
-                    time.sleep(self._retry_delay)
-                logger.info("Retrying webhook...")
-
-            attempts += 1
-
-            try:
-                if self._format == 'form':
-                    response = post(self._url, data=payload)
-                elif self._format == 'json':
-                    response = post(self._url, json=payload)
-                elif self._format == 'raw':
-                    response = post(self._url, data=payload['data'],
-                                    headers={'Content-Type': 'text/plain'})
-                else:
-                    raise NotImplementedError(f'Unknown format: {self._format}')
-
-                # Throw a RequestException if the post was not successful
-                response.raise_for_status()
-                success = True
-
-            except RequestException as exc:
-                logger.warning("Could not call webhook url. Exception: %s", exc)
+        try:
+            post = self._session.post
+            success = False
+            attempts = 0
+            while not success and attempts <= self._retries:
+                if attempts:
+                    if self._retry_delay:
+                        time.sleep(self._retry_delay)
+                    logger.info("Retrying webhook...")
+
+                attempts += 1
+
+                try:
+                    response = post(self._url, timeout=self._timeout, **post_kwargs)
+
+                    # Throw a RequestException if the post was not successful
+                    response.raise_for_status()
+                    success = True
+
+                except RequestException as exc:
+                    logger.warning("Could not call webhook url. Exception: %s", exc)
+        except Exception:
+            # Runs in the sender thread - nobody else would see the error.
+            logger.exception('Exception occurred while calling webhook')
@@ -36,6 +36,9 @@ def test_init_custom_db_url(default_conf, tmpdir):
     assert Path(filename).is_file()
     r = Trade.session.execute(text("PRAGMA journal_mode"))
     assert r.first() == ('wal',)
+    r = Trade.session.execute(text("PRAGMA synchronous"))
+    # 1 == NORMAL
+    assert r.first() == (1,)
 
 
 def test_init_invalid_db_url():
@@ -4,19 +4,23 @@
 
 import logging
 import re
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from functools import reduce
+from queue import Empty, Full
 from random import choice, randint
 from string import ascii_uppercase
-from unittest.mock import ANY, MagicMock
+from threading import Timer
+from unittest.mock import ANY, MagicMock, call
 
 import arrow
 import pytest
 import time_machine
 from pandas import DataFrame
 from sqlalchemy import select
-from telegram import Chat, Message, ReplyKeyboardMarkup, Update
-from telegram.error import BadRequest, NetworkError, TelegramError
+from telegram import MAX_MESSAGE_LENGTH, Chat, Message, ReplyKeyboardMarkup, Update
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
 
 from freqtrade import __version__
 from freqtrade.constants import CANCEL_REASON
@@ -30,7 +34,9 @@ from freqtrade.persistence import PairLocks, Trade
 from freqtrade.persistence.models import Order
 from freqtrade.rpc import RPC
 from freqtrade.rpc.rpc import RPCException
-from freqtrade.rpc.telegram import Telegram, authorized_only
+from freqtrade.rpc.telegram import (GROUP_MESSAGES_PER_MINUTE, NOTIFICATION_BATCH_WINDOW,
+                                    SEND_MSG_ATTEMPTS, SEND_MSG_MAX_RETRY_AFTER,
+                                    SENDER_STOP_TIMEOUT, Telegram, authorized_only)
 from tests.conftest import (CURRENT_TEST_STRATEGY, EXMS, create_mock_trades,
                             create_mock_trades_usdt, get_patched_freqtradebot, log_has, log_has_re,
                             patch_exchange, patch_get_signal, patch_whitelist)
@@ -69,7 +75,8 @@ def get_telegram_testobject(mocker, default_conf, mock=True, ftbot=None):
         mocker.patch.multiple(
             'freqtrade.rpc.telegram.Telegram',
             _init=MagicMock(),
-            _send_msg=msg_mock
+            _send_msg=msg_mock,
+            _queue_msg=msg_mock,
         )
     if not ftbot:
         ftbot = get_patched_freqtradebot(mocker, default_conf)
@@ -120,8 +127,36 @@ def test_cleanup(default_conf, mocker, ) -> None:
     mocker.patch('freqtrade.rpc.telegram.Updater', updater_mock)
 
     telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    assert telegram._sender.is_alive()
+    join_mock = mocker.spy(telegram._sender, 'join')
     telegram.cleanup()
     assert telegram._updater.stop.call_count == 1
+    assert not telegram._sender.is_alive()
+    join_mock.assert_called_once_with(timeout=SENDER_STOP_TIMEOUT)
+
+
+def test_cleanup_full_queue(default_conf, mocker, caplog) -> None:
+    mocker.patch('freqtrade.rpc.telegram.Updater', MagicMock())
+    mocker.patch('freqtrade.rpc.telegram.SENDER_STOP_TIMEOUT', 0.1)
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    release = threading.Event()
+    send_mock = mocker.patch.object(telegram, '_send_msg',
+                                    side_effect=lambda *args, **kwargs: release.wait())
+    for i in range(3):
+        telegram._send_queue.put((f'test{i}', False))
+    # The sentinel can't be queued while the sender is stuck
+    put_mock = mocker.patch.object(telegram._send_queue, 'put', side_effect=Full)
+
+    telegram.cleanup()
+    put_mock.assert_called_once_with(None, timeout=1)
+    assert log_has('Telegram sender did not stop within 0.1 seconds.', caplog)
+    assert telegram._updater.stop.call_count == 1
+
+    # Without the sentinel, the sender still stops once the queue is empty.
+    release.set()
+    telegram._sender.join(timeout=5)
+    assert not telegram._sender.is_alive()
+    assert send_mock.call_count == 3
 
 
 def test_authorized_only(default_conf, mocker, caplog, update) -> None:
@@ -1766,6 +1801,25 @@ def test_show_config_handle(default_conf, update, mocker) -> None:
     assert '*Initial Stoploss:* `-0.1`' in msg_mock.call_args_list[0][0][0]
 
 
+def test__add_analyzed_candle(default_conf, mocker) -> None:
+    default_conf['telegram']['notification_settings']['show_candle'] = 'ohlc'
+    df = DataFrame({'open': [1.1], 'high': [2.2], 'low': [1.0], 'close': [1.5]})
+    last_analyzed = datetime(2023, 4, 1, tzinfo=timezone.utc)
+    df_mock = mocker.patch('freqtrade.data.dataprovider.DataProvider.get_analyzed_dataframe',
+                           return_value=(df, last_analyzed))
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf)
+
+    assert telegram._add_analyzed_candle('ETH/BTC') == '*Candle OHLC*: `1.1, 2.2, 1.0, 1.5`\n'
+
+    df_mock.return_value = (DataFrame(), last_analyzed)
+    assert telegram._add_analyzed_candle('XRP/BTC') == ''
+
+    telegram._show_candle = 'off'
+    df_mock.reset_mock()
+    assert telegram._add_analyzed_candle('ETH/BTC') == ''
+    assert df_mock.call_count == 0
+
+
 @pytest.mark.parametrize('message_type,enter,enter_signal,leverage', [
     (RPCMessageType.ENTRY, 'Long', 'long_signal_01', None),
     (RPCMessageType.ENTRY, 'Long', 'long_signal_01', 1.0),
@@ -2082,9 +2136,9 @@ def test_send_msg_sell_cancel_notification(default_conf, mocker) -> None:
         '\N{WARNING SIGN} *Binance (dry):* Cancelling exit Order for KEY/ETH (#1).'
         ' Reason: Cancelled on exchange.')
 
-    msg_mock.reset_mock()
     # Test with live mode (no dry appendix)
-    telegram._config['dry_run'] = False
+    default_conf['dry_run'] = False
+    telegram, _, msg_mock = get_telegram_testobject(mocker, default_conf)
     telegram.send_msg({
         'type': RPCMessageType.EXIT_CANCEL,
         'trade_id': 1,
@@ -2110,7 +2164,7 @@ def test_send_msg_sell_fill_notification(default_conf, mocker, direction,
     telegram, _, msg_mock = get_telegram_testobject(mocker, default_conf)
 
     with time_machine.travel("2022-09-01 05:00:00 +00:00", tick=False):
-        telegram.send_msg({
+        msg = {
             'type': RPCMessageType.EXIT_FILL,
             'trade_id': 1,
             'exchange': 'Binance',
@@ -2130,7 +2184,11 @@ def test_send_msg_sell_fill_notification(default_conf, mocker, direction,
             'exit_reason': ExitType.STOP_LOSS.value,
             'open_date': arrow.utcnow().shift(days=-1, hours=-2, minutes=-30),
             'close_date': arrow.utcnow(),
-        })
+        }
+        msg_orig = msg.copy()
+        telegram.send_msg(msg)
+        # The message is not modified for other rpc handlers
+        assert msg == msg_orig
 
         leverage_text = f'*Leverage:* `{leverage}`\n' if leverage and leverage != 1.0 else ''
         assert msg_mock.call_args[0][0] == (
@@ -2299,7 +2357,7 @@ def test__sell_emoji(default_conf, mocker, msg, expected):
 
     telegram, _, _ = get_telegram_testobject(mocker, default_conf)
 
-    assert telegram._get_sell_emoji(msg) == expected
+    assert telegram._get_sell_emoji(msg['profit_percent'], msg['exit_reason']) == expected
 
 
 def test_telegram__send_msg(default_conf, mocker, caplog) -> None:
@@ -2344,12 +2402,185 @@ def test__send_msg_network_error(default_conf, mocker, caplog) -> None:
     telegram._updater = MagicMock()
     telegram._updater.bot = bot
 
+    wait_mock = mocker.patch.object(telegram._stopping, 'wait', return_value=False)
+
     telegram._config['telegram']['enabled'] = True
     telegram._send_msg('test')
 
-    # Bot should've tried to send it twice
-    assert len(bot.method_calls) == 2
-    assert log_has('Telegram NetworkError: Oh snap! Trying one more time.', caplog)
+    # Bot should've tried to send it SEND_MSG_ATTEMPTS times, backing off in between
+    assert len(bot.method_calls) == SEND_MSG_ATTEMPTS
+    assert wait_mock.call_count == SEND_MSG_ATTEMPTS - 1
+    assert log_has('Telegram NetworkError: Oh snap!', caplog)
+    assert log_has(f'Telegram message could not be sent after {SEND_MSG_ATTEMPTS} attempts.',
+                   caplog)
+
+
+def test__send_msg_retry_after(default_conf, mocker, caplog) -> None:
+    mocker.patch('freqtrade.rpc.telegram.Telegram._init', MagicMock())
+    bot = MagicMock()
+    bot.send_message = MagicMock(side_effect=[RetryAfter(3), None])
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    telegram._updater = MagicMock()
+    telegram._updater.bot = bot
+    wait_mock = mocker.patch.object(telegram._stopping, 'wait', return_value=False)
+
+    telegram._send_msg('test')
+
+    assert bot.send_message.call_count == 2
+    wait_mock.assert_called_once_with(3)
+    assert log_has('Telegram RetryAfter: retry in 3.0 seconds.', caplog)
+
+    # Flood control on the last attempt - give up without waiting
+    bot.send_message = MagicMock(side_effect=[NetworkError('Oh snap')] * (SEND_MSG_ATTEMPTS - 1)
+                                 + [RetryAfter(30)])
+    wait_mock.reset_mock()
+    telegram._send_msg('test')
+
+    assert bot.send_message.call_count == SEND_MSG_ATTEMPTS
+    assert wait_mock.call_count == SEND_MSG_ATTEMPTS - 1
+    assert 30 not in [c[0][0] for c in wait_mock.call_args_list]
+    assert log_has(f'Telegram message could not be sent after {SEND_MSG_ATTEMPTS} attempts.',
+                   caplog)
+
+    # Very long flood control waits drop the message
+    bot.send_message = MagicMock(side_effect=RetryAfter(SEND_MSG_MAX_RETRY_AFTER + 1))
+    wait_mock.reset_mock()
+    telegram._send_msg('test')
+    assert bot.send_message.call_count == 1
+    assert wait_mock.call_count == 0
+    assert log_has(f'Telegram RetryAfter: retry in {SEND_MSG_MAX_RETRY_AFTER + 1}.0 seconds! '
+                   'Giving up on that message.', caplog)
+
+    # Shutdown interrupts the wait
+    bot.send_message = MagicMock(side_effect=RetryAfter(3))
+    wait_mock.return_value = True
+    telegram._send_msg('test')
+    assert bot.send_message.call_count == 1
+    assert log_has('Telegram is shutting down, giving up on that message.', caplog)
+
+
+def test__send_msg_bad_request(default_conf, mocker, caplog) -> None:
+    mocker.patch('freqtrade.rpc.telegram.Telegram._init', MagicMock())
+    bot = MagicMock()
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    telegram._updater = MagicMock()
+    telegram._updater.bot = bot
+    wait_mock = mocker.patch.object(telegram._stopping, 'wait', return_value=False)
+
+    # Markdown errors fall back to plain text
+    bot.send_message = MagicMock(side_effect=[BadRequest("Can't parse entities"), None])
+    telegram._send_msg('test')
+    assert bot.send_message.call_count == 2
+    assert bot.send_message.call_args_list[1][1]['parse_mode'] is None
+    assert log_has("TelegramError: Can't parse entities! Sending as plain text.", caplog)
+
+    # Other bad requests are not retried
+    bot.send_message = MagicMock(side_effect=BadRequest('Chat not found'))
+    telegram._send_msg('test')
+    assert bot.send_message.call_count == 1
+    assert log_has('TelegramError: Chat not found! Giving up on that message.', caplog)
+    assert wait_mock.call_count == 0
+
+
+def test__queue_msg(default_conf, mocker, caplog) -> None:
+    mocker.patch('freqtrade.rpc.telegram.Updater', MagicMock())
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    msg_mock = MagicMock(side_effect=[None, ValueError('Oh snap')])
+    telegram._send_msg = msg_mock
+
+    telegram._queue_msg('test', disable_notification=True)
+    telegram._queue_msg('test2')
+    # cleanup flushes the queue before stopping the sender thread.
+    telegram.cleanup()
+
+    assert msg_mock.call_count == 2
+    assert msg_mock.call_args_list[0][0][0] == 'test'
+    assert msg_mock.call_args_list[0][1]['disable_notification'] is True
+    assert msg_mock.call_args_list[1][1]['disable_notification'] is False
+    assert log_has('Exception occurred while sending telegram message', caplog)
+    assert not telegram._sender.is_alive()
+
+    # Queue is full - message is dropped.
+    telegram._send_queue = MagicMock()
+    telegram._send_queue.put = MagicMock(side_effect=Full())
+    telegram._queue_msg('test3')
+    assert log_has('Telegram send queue is full, dropping message.', caplog)
+
+
+def test__wait_for_send_slot(default_conf, mocker) -> None:
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf)
+    wait_mock = mocker.patch.object(telegram._stopping, 'wait', return_value=False)
+    mocker.patch('freqtrade.rpc.telegram.time.monotonic', return_value=100.0)
+
+    # Private chats are not paced
+    for _ in range(GROUP_MESSAGES_PER_MINUTE + 1):
+        telegram._wait_for_send_slot()
+    assert wait_mock.call_count == 0
+
+    default_conf['telegram']['chat_id'] = '-1001234'
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf)
+    wait_mock = mocker.patch.object(telegram._stopping, 'wait', return_value=False)
+    for _ in range(GROUP_MESSAGES_PER_MINUTE):
+        telegram._wait_for_send_slot()
+    assert wait_mock.call_count == 0
+    telegram._wait_for_send_slot()
+    wait_mock.assert_called_once_with(60)
+
+    # Shutdown interrupts / skips the wait
+    wait_mock.reset_mock()
+    telegram._stopping.set()
+    telegram._wait_for_send_slot()
+    assert wait_mock.call_count == 0
+
+
+def test__wait_for_send_slot_interrupted(default_conf, mocker) -> None:
+    default_conf['telegram']['chat_id'] = '-1001234'
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf)
+    telegram._sent_times.extend([time.monotonic()] * GROUP_MESSAGES_PER_MINUTE)
+
+    Timer(0.05, telegram._stopping.set).start()
+    start = time.monotonic()
+    telegram._wait_for_send_slot()
+    assert time.monotonic() - start < 5
+
+
+def test__process_send_queue_batched(default_conf, mocker) -> None:
+    default_conf['telegram']['batch_notifications'] = True
+    mocker.patch('freqtrade.rpc.telegram.Telegram._init', MagicMock())
+    telegram, _, _ = get_telegram_testobject(mocker, default_conf, mock=False)
+    msg_mock = MagicMock()
+    telegram._send_msg = msg_mock
+
+    long_msg = 'a' * (MAX_MESSAGE_LENGTH - 5)
+    telegram._queue_msg('test1')
+    telegram._queue_msg('test2')
+    telegram._queue_msg('test3', disable_notification=True)
+    telegram._queue_msg(long_msg, disable_notification=True)
+    telegram._send_queue.put(None)
+    telegram._process_send_queue()
+
+    assert msg_mock.call_count == 3
+    assert msg_mock.call_args_list[0][0][0] == 'test1\n\ntest2'
+    assert msg_mock.call_args_list[0][1]['disable_notification'] is False
+    assert msg_mock.call_args_list[1][0][0] == 'test3'
+    assert msg_mock.call_args_list[1][1]['disable_notification'] is True
+    # Too long to be merged
+    assert msg_mock.call_args_list[2][0][0] == long_msg
+
+    # Messages arriving within the batch window are merged,
+    # later ones start a new batch.
+    msg_mock.reset_mock()
+    mocker.patch('freqtrade.rpc.telegram.time.monotonic', return_value=100.0)
+    get_mock = mocker.patch.object(telegram._send_queue, 'get', side_effect=[
+        ('test4', False), ('test5', False), Empty(),
+        ('test6', False), None,
+    ])
+    telegram._process_send_queue()
+    assert msg_mock.call_count == 2
+    assert msg_mock.call_args_list[0] == call('test4\n\ntest5', disable_notification=False)
+    assert msg_mock.call_args_list[1] == call('test6', disable_notification=False)
+    # Waits for further messages for the remaining window
+    assert get_mock.call_args_list[1] == call(timeout=NOTIFICATION_BATCH_WINDOW)
 
 
 def test__send_msg_keyboard(default_conf, mocker, caplog) -> None:
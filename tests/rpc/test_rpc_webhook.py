@@ -1,15 +1,20 @@
 # pragma pylint: disable=missing-docstring, C0103, protected-access
 
 from datetime import datetime, timedelta
+from queue import Full
+from threading import Event
 from unittest.mock import MagicMock
 
+import pytest
+from jsonschema import ValidationError
 from requests import RequestException
 
+from freqtrade.configuration.config_validation import validate_config_schema
 from freqtrade.enums import ExitType, RPCMessageType
 from freqtrade.rpc import RPC
 from freqtrade.rpc.discord import Discord
 from freqtrade.rpc.webhook import Webhook
-from tests.conftest import get_patched_freqtradebot, log_has
+from tests.conftest import get_patched_freqtradebot, log_has, log_has_re
 
 
 def get_webhook_dict() -> dict:
@@ -371,30 +376,87 @@ def test__send_msg(default_conf, mocker, caplog):
     msg = {'value1': 'DEADBEEF',
            'value2': 'ALIVEBEEF',
            'value3': 'FREQTRADE'}
-    post = MagicMock()
-    mocker.patch("freqtrade.rpc.webhook.post", post)
-    webhook._send_msg(msg)
+    post = mocker.patch.object(webhook._session, 'post')
+    webhook._post(webhook._get_post_kwargs(msg))
 
     assert post.call_count == 1
-    assert post.call_args[1] == {'data': msg}
+    assert post.call_args[1] == {'data': msg, 'timeout': 10}
     assert post.call_args[0] == (default_conf['webhook']['url'], )
 
-    post = MagicMock(side_effect=RequestException)
-    mocker.patch("freqtrade.rpc.webhook.post", post)
-    webhook._send_msg(msg)
+    post.side_effect = RequestException
+    webhook._post(webhook._get_post_kwargs(msg))
     assert log_has('Could not call webhook url. Exception: ', caplog)
 
+    # Unexpected errors in the sender thread are logged, not swallowed
+    post.side_effect = ValueError('Oh snap')
+    webhook._post(webhook._get_post_kwargs(msg))
+    assert log_has('Exception occurred while calling webhook', caplog)
+
+    # _send_msg posts from the sender thread, cleanup waits for it
+    post.reset_mock(side_effect=True)
+    close_mock = mocker.patch.object(webhook._session, 'close')
+    webhook._send_msg(msg)
+    webhook.cleanup()
+    assert post.call_count == 1
+    assert close_mock.call_count == 1
+
+
+def test__send_msg_queue_full(default_conf, mocker, caplog):
+    default_conf["webhook"] = get_webhook_dict()
+    webhook = Webhook(RPC(get_patched_freqtradebot(mocker, default_conf)), default_conf)
+    mocker.patch.object(webhook._send_queue, 'put', side_effect=Full)
+
+    webhook._send_msg({'value1': 'DEADBEEF'})
+    assert log_has('Webhook send queue is full, dropping message.', caplog)
+
+
+def test_cleanup_stuck_sender(default_conf, mocker, caplog):
+    default_conf["webhook"] = get_webhook_dict()
+    mocker.patch('freqtrade.rpc.webhook.SENDER_STOP_TIMEOUT', 0.1)
+    webhook = Webhook(RPC(get_patched_freqtradebot(mocker, default_conf)), default_conf)
+    release = Event()
+    post = mocker.patch.object(webhook._session, 'post', side_effect=lambda *a, **k: release.wait())
+
+    for _ in range(5):
+        webhook._send_msg({'value1': 'DEADBEEF'})
+    webhook.cleanup()
+    # Doesn't wait for the hanging endpoint, the backlog is dropped
+    assert webhook._sender.is_alive()
+    assert log_has_re(r'Webhook sender did not stop within 0.1 seconds, dropped [34] messages.',
+                      caplog)
+
+    release.set()
+    webhook._sender.join(timeout=5)
+    assert not webhook._sender.is_alive()
+    assert post.call_count <= 2
+
+
+def test__send_msg_timeout(default_conf, mocker):
+    default_conf["webhook"] = get_webhook_dict()
+    default_conf["webhook"]["timeout"] = 2.5
+    webhook = Webhook(RPC(get_patched_freqtradebot(mocker, default_conf)), default_conf)
+    post = mocker.patch.object(webhook._session, 'post')
+    webhook._post(webhook._get_post_kwargs({'value1': 'DEADBEEF'}))
+
+    assert post.call_args[1]['timeout'] == 2.5
+
+    # requests refuses a timeout of 0
+    default_conf["webhook"]["timeout"] = 0
+    with pytest.raises(ValidationError):
+        validate_config_schema(default_conf)
+
 
 def test__send_msg_with_json_format(default_conf, mocker, caplog):
     default_conf["webhook"] = get_webhook_dict()
     default_conf["webhook"]["format"] = "json"
     webhook = Webhook(RPC(get_patched_freqtradebot(mocker, default_conf)), default_conf)
     msg = {'text': 'Hello'}
-    post = MagicMock()
-    mocker.patch("freqtrade.rpc.webhook.post", post)
-    webhook._send_msg(msg)
+    post = mocker.patch.object(webhook._session, 'post')
+    webhook._post(webhook._get_post_kwargs(msg))
 
-    assert post.call_args[1] == {'json': msg}
+    assert post.call_args[1] == {'data': b'{"text":"Hello"}',
+                                 'headers': {'Content-Type': 'application/json'},
+                                 'timeout': 10}
 
 
 def test__send_msg_with_raw_format(default_conf, mocker, caplog):
@@ -402,11 +464,24 @@ def test__send_msg_with_raw_format(default_conf, mocker, caplog):
     default_conf["webhook"]["format"] = "raw"
     webhook = Webhook(RPC(get_patched_freqtradebot(mocker, default_conf)), default_conf)
     msg = {'data': 'Hello'}
-    post = MagicMock()
-    mocker.patch("freqtrade.rpc.webhook.post", post)
-    webhook._send_msg(msg)
+    post = mocker.patch.object(webhook._session, 'post')
+    webhook._post(webhook._get_post_kwargs(msg))
+
+    assert post.call_args[1] == {'data': msg['data'], 'headers': {'Content-Type': 'text/plain'},
+                                 'timeout': 10}
+
+    # Raw payloads without 'data' are a configuration problem, reported on the caller thread
+    post.reset_mock()
+    default_conf["webhook"]["strategy_msg"] = {"value1": "{msg}"}
+    webhook.send_msg({'type': RPCMessageType.STRATEGY_MSG, 'msg': 'hello world'})
+    webhook.cleanup()
+    assert post.call_count == 0
+    assert log_has("Problem calling Webhook. Please check your webhook configuration. "
+                   "Exception: 'data'", caplog)
 
-    assert post.call_args[1] == {'data': msg['data'], 'headers': {'Content-Type': 'text/plain'}}
+    webhook._format = 'xml'
+    with pytest.raises(NotImplementedError, match='Unknown format: xml'):
+        webhook._send_msg(msg)
 
 
 def test_send_msg_discord(default_conf, mocker):